@@ -1,133 +1,153 @@
-import PySimpleGUI as sg
 import ast
-import black
+import functools
+
+
+PYTHON_OPERATORS = {
+    '=': '==',
+    '!=': '!=',
+    '>': '>',
+    '<': '<',
+    '>=': '>=',
+    '<=': '<=',
+    'in': 'in',
+    'not in': 'not in',
+    'like': 'like',
+    'ilike': 'ilike',
+    '=like': '=like',
+    '=ilike': '=ilike',
+    'child_of': 'child_of',
+    '&': 'and',
+    '|': 'or',
+    '!': 'not'
+}
+
+PSEUDOCODE_OPERATORS = {
+    '=': 'is equal to',
+    '!=': 'is not equal to',
+    '>': 'is greater than',
+    '<': 'is less than',
+    '>=': 'is greater than or equal to',
+    '<=': 'is less than or equal to',
+    'in': 'is in',
+    'not in': 'is not in',
+    'like': 'matches (case sensitive, with wildcards) the pattern',
+    'ilike': 'matches (case insensitive, with wildcards) the pattern',
+    '=like': 'matches exactly (case sensitive) the pattern',
+    '=ilike': 'matches exactly (case insensitive) the pattern',
+    'child_of': 'is a child of',
+    '&': 'and',
+    '|': 'or',
+    '!': 'not'
+}
+
+PYTHON_SEPARATORS = {
+    operator: f' {word} ' for operator, word in PYTHON_OPERATORS.items()
+}
+
+PSEUDOCODE_SEPARATORS = {
+    operator: f"\n{word}\n" for operator, word in PSEUDOCODE_OPERATORS.items()
+}
+
+
+def _process_condition(condition, operator_dict):
+    """Convert a condition tuple to an expression string using operator_dict."""
+    field, operator, value = condition
+    if operator == '=?':
+        if value in (None, False):
+            return 'True'
+        else:
+            operator = '='
+    if isinstance(value, list):
+        value = ', '.join(map(str, value))
+    return f"({field} {operator_dict[operator]} {value})"
+
+
+def _join_fragments(fragments, stack, top, separator):
+    """Extend fragments with the first top stack entries, separated by separator."""
+    for index in range(top):
+        if index:
+            fragments.append(separator)
+        fragments.extend(stack[index])
+
+
+def _convert(domain, operators, separators, open_paren, close_paren):
+    """Convert a domain using the given operator and separator tables."""
+    if len(domain) == 1 and isinstance(domain[0], tuple):
+        return _process_condition(domain[0], operators)
+    # Stack entries are lists of string fragments, joined once at the end so
+    # nested operators do not copy their operands' text over and over. Every
+    # element pushes at most one entry, so the stack never outgrows the domain.
+    # Nested domains suspend the current (elements, stack, top) frame on
+    # frames instead of recursing, and resume it with the nested result.
+    frames = []
+    elements = reversed(domain)
+    stack = [None] * len(domain)
+    top = 0
+    while True:
+        for element in elements:
+            if isinstance(element, tuple):
+                stack[top] = [_process_condition(element, operators)]
+                top += 1
+            elif isinstance(element, list):
+                frames.append((elements, stack, top))
+                elements = reversed(element)
+                stack = [None] * len(element)
+                top = 0
+                break
+            elif element == '!':
+                if not top:
+                    raise IndexError("'!' operator has no operand")
+                stack[top - 1] = [operators[element], ' ', *stack[top - 1]]
+            else:
+                separator = separators.get(element)
+                if separator is not None:
+                    fragments = [open_paren]
+                    _join_fragments(fragments, stack, top, separator)
+                    fragments.append(close_paren)
+                    stack[0] = fragments
+                    top = 1
+        else:
+            del stack[top:]
+            result = stack[0]
+            if not frames:
+                return ''.join(result)
+            elements, stack, top = frames.pop()
+            stack[top] = result
+            top += 1
 
 
 def convert_odoo_domain_to_python(domain):
     """Convert an Odoo domain expression to a Python expression."""
-    operator_dict = {
-        '=': '==',
-        '!=': '!=',
-        '>': '>',
-        '<': '<',
-        '>=': '>=',
-        '<=': '<=',
-        'in': 'in',
-        'not in': 'not in',
-        'like': 'like',
-        'ilike': 'ilike',
-        '=like': '=like',
-        '=ilike': '=ilike',
-        'child_of': 'child_of',
-        '&': 'and',
-        '|': 'or',
-        '!': 'not'
-    }
-
-    def process_condition(condition):
-        """Convert a condition tuple to a Python expression string."""
-        field, operator, value = condition
-        if operator == '=?':
-            if value in (None, False):
-                return 'True'
-            else:
-                operator = '='
-        if isinstance(value, list):
-            value = ', '.join(map(str, value))
-        return f"({field} {operator_dict[operator]} {value})"
-
-    def process_subexpression(subexpression):
-        """Convert a subexpression list to a Python expression string."""
-        if isinstance(subexpression, tuple):
-            return process_condition(subexpression)
-        elif isinstance(subexpression, list):
-            return convert_odoo_domain_to_python(subexpression)
-
-    stack = []
-    for i in reversed(range(len(domain))):
-        element = domain[i]
-        if isinstance(element, tuple):
-            stack.append(process_condition(element))
-        elif isinstance(element, list):
-            stack.append(process_subexpression(element))
-        elif element in operator_dict:
-            if element == '!':
-                operand = stack.pop()
-                stack.append(f"{operator_dict[element]} {operand}")
-            else:
-                operands = []
-                while len(stack) > 0 and isinstance(stack[-1], str):
-                    operands.append(stack.pop())
-                operands.reverse()
-                stack.append(f"({f' {operator_dict[element]} '.join(operands)})")
-    return stack[0]
-    # return stack[0]
+    return _convert(domain, PYTHON_OPERATORS, PYTHON_SEPARATORS, '(', ')')
 
 
 def convert_odoo_domain_to_pseudocode(domain):
     """Convert an Odoo domain expression to a Python-flavored pseudocode."""
-    operator_dict = {
-        '=': 'is equal to',
-        '!=': 'is not equal to',
-        '>': 'is greater than',
-        '<': 'is less than',
-        '>=': 'is greater than or equal to',
-        '<=': 'is less than or equal to',
-        'in': 'is in',
-        'not in': 'is not in',
-        'like': 'matches (case sensitive, with wildcards) the pattern',
-        'ilike': 'matches (case insensitive, with wildcards) the pattern',
-        '=like': 'matches exactly (case sensitive) the pattern',
-        '=ilike': 'matches exactly (case insensitive) the pattern',
-        'child_of': 'is a child of',
-        '&': 'and',
-        '|': 'or',
-        '!': 'not'
-    }
-
-    def process_condition(condition):
-        """Convert a condition tuple to a Python pseudocode string."""
-        field, operator, value = condition
-        if operator == '=?':
-            if value in (None, False):
-                return 'True'
-            else:
-                operator = '='
-        if isinstance(value, list):
-            value = ', '.join(map(str, value))
-        return f"({field} {operator_dict[operator]} {value})"
-
-    def process_subexpression(subexpression):
-        """Convert a subexpression list to a Python pseudocode string."""
-        if isinstance(subexpression, tuple):
-            return process_condition(subexpression)
-        elif isinstance(subexpression, list):
-            return convert_odoo_domain_to_pseudocode(subexpression)
-
-    stack = []
-    for i in reversed(range(len(domain))):
-        element = domain[i]
-        if isinstance(element, tuple):
-            stack.append(process_condition(element))
-        elif isinstance(element, list):
-            stack.append(process_subexpression(element))
-        elif element in operator_dict:
-            if element == '!':
-                operand = stack.pop()
-                stack.append(f"{operator_dict[element]} {operand}")
-            else:
-                operands = []
-                while len(stack) > 0 and isinstance(stack[-1], str):
-                    operands.append(stack.pop())
-                operands.reverse()
-                stack.append(f"\n{operator_dict[element]}\n".join(operands))
-    return stack[0]
+    return _convert(domain, PSEUDOCODE_OPERATORS, PSEUDOCODE_SEPARATORS, '', '')
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_domain(domain_str):
+    """Parse a domain string; the cached result is shared and must not be mutated."""
+    return ast.literal_eval(domain_str)
+
+
+@functools.lru_cache(maxsize=32)
+def convert_domain_string(domain_str, to_python):
+    """Parse and convert a domain string, caching the output per format."""
+    domain = parse_domain(domain_str)
+    if to_python:
+        return convert_odoo_domain_to_python(domain)
+    return convert_odoo_domain_to_pseudocode(domain)
+
 
 font = ("Helvetica", 20)
 
 
 def convert_odoo_domain_to_python_gui():
     """A GUI for the convert_odoo_domain_to_python function."""
+    import PySimpleGUI as sg
+
     layout = [
         [
             sg.Text(
@@ -152,17 +172,13 @@ def convert_odoo_domain_to_python_gui():
         if event == "Convert":
             try:
                 domain_str = values["-INPUT-"].strip()
-                domain = ast.literal_eval(domain_str)
-                if values['-RADIO_PY-']:
-                    output = convert_odoo_domain_to_python(domain)
-                else:
-                    output = convert_odoo_domain_to_pseudocode(domain)
+                output = convert_domain_string(domain_str, values['-RADIO_PY-'])
                 window['-OUTPUT-'].update(output)
-                # python_expression = convert_odoo_domain_to_python(domain)
-                # window["-OUTPUT-"].update(python_expression)
             except Exception as e:
                 window["-OUTPUT-"].update(str(e))
     window.close()
+    convert_domain_string.cache_clear()
+    parse_domain.cache_clear()
 
 
 # Run the GUI